@@ -2,12 +2,27 @@ import pandas as pd
 import numpy as np
 import dash
 from dash import dcc, html, callback, Input, Output
+from flask_caching import Cache
 import plotly.graph_objects as go
+import plotly.express as px
 from plotly.subplots import make_subplots
 import os
 from datetime import datetime, timedelta
+from functools import lru_cache
 from ttf_futures import DataStore, SecurityType
 
+# Copy-on-write, so callbacks can add columns to slices of the shared intraday frames without copying them up front
+pd.options.mode.copy_on_write = True
+
+# Chart styling shared by the callbacks
+# Distinct colors for the days (cycled if more days than colors)
+COLORS = px.colors.qualitative.Plotly + px.colors.qualitative.Dark24
+# Marker symbols for variety
+MARKER_SYMBOLS = ['circle', 'square', 'diamond', 'cross', 'x', 'triangle-up',
+                  'triangle-down', 'star', 'pentagon', 'hexagon']
+# Hourly ticks of the fixed 7:00 to 17:00 time axis
+TICK_VALS = [f"{hour:02d}:00" for hour in range(7, 18)]
+
 # Initialize the DataStore
 pickle_file = "ttf_futures_data.pkl"
 
@@ -23,10 +38,24 @@ else:
     datastore.save_to_pickle(pickle_file)
 
 
+# Intraday data files
+intraday_csv_file = "contract_data.csv"
+intraday_pickle_file = "contract_data.pkl"
+
+
 def load_intraday_data():
     """func for loading intraday form the csv - contracts,csv."""
      
-    df = pd.read_csv("contract_data.csv", delimiter=';')
+    # Prices only need float32 precision for plotting, the pyarrow engine parses the file multi-threaded
+    df = pd.read_csv(
+        intraday_csv_file,
+        delimiter=';',
+        engine='pyarrow',
+        dtype={'OPEN': 'float32', 'HIGH': 'float32', 'LOW': 'float32', 'CLOSE': 'float32', 'VOLUME': 'float32'}
+    )
+    
+    # VOLUME is written as e.g. 1847.0 in the file, so read it as a float and store whole numbers
+    df['VOLUME'] = df['VOLUME'].astype('int32')
     
     # Split the Time column into Date and Time
     df[['Date', 'Time']] = df['Time'].str.split(' ', expand=True)
@@ -34,15 +63,94 @@ def load_intraday_data():
     #  Date to datetime , correct format with dots (DD.MM.YYYY)
     df['Date'] = pd.to_datetime(df['Date'], format='%d.%m.%Y')
     
-    df['Timestamp'] = pd.to_datetime(df['Date'].astype(str) + ' ' + df['Time'])
+    # Time is HH:MM, so add it to Date as an offset instead of re-parsing a concatenated string
+    df['Timestamp'] = df['Date'] + pd.to_timedelta(df['Time'] + ':00')
+    
+    # Keep only the 7:00 to 17:00 window shown in the charts
+    hour = df['Timestamp'].dt.hour
+    df = df[(hour >= 7) & (hour <= 17)].reset_index(drop=True)
     
     # Remove prefix from contracts
     df['symbol'] = df['symbol'].str.replace('ENDEX::F:', '', regex=False)
     
+    # Only a handful of distinct contracts and bar times, store them as categories
+    df['symbol'] = df['symbol'].astype('category')
+    df['Time'] = df['Time'].astype('category')
+    
     return df
 
-# Load the intraday data
-intraday_data = load_intraday_data()
+# Load the intraday data, reusing the serialized copy unless the CSV is newer
+if (os.path.exists(intraday_pickle_file)
+        and os.path.getmtime(intraday_pickle_file) >= os.path.getmtime(intraday_csv_file)):
+    print(f"Loading intraday data from serialized file: {intraday_pickle_file}")
+    intraday_data = pd.read_pickle(intraday_pickle_file)
+else:
+    print("Loading intraday data from CSV file and creating new serialized data")
+    intraday_data = load_intraday_data()
+    # Save to disk for future use
+    intraday_data.to_pickle(intraday_pickle_file)
+
+# Index the intraday data by contract, each frame sorted by Timestamp
+intraday_by_symbol = {
+    symbol: symbol_data.sort_values('Timestamp')
+    for symbol, symbol_data in intraday_data.groupby('symbol', sort=False, observed=True)
+}
+
+
+def slice_date_range(data, start_date, end_date):
+    """Rows of a Timestamp-sorted frame with Date between start_date and end_date (inclusive)."""
+    # Date is sorted along with Timestamp, so the range is a positional slice
+    lo = data['Date'].searchsorted(pd.Timestamp(start_date), side='left')
+    hi = data['Date'].searchsorted(pd.Timestamp(end_date), side='right')
+    return data.iloc[lo:hi]
+
+
+def get_contract_data(symbol, start_date, end_date):
+    """Intraday bars of one contract with Date between start_date and end_date (inclusive)."""
+    contract_data = intraday_by_symbol.get(symbol)
+    if contract_data is None:
+        return intraday_data.iloc[0:0]
+    return slice_date_range(contract_data, start_date, end_date)
+
+
+# Spread bars per (leg 1, leg 2) contract pair, built on first use
+spread_bars = {}
+
+
+def get_spread_bars(contract1_code, contract2_code):
+    """Bars of both legs merged on Timestamp with the spread OHLC columns, over the whole history."""
+    key = (contract1_code, contract2_code)
+    if key not in spread_bars:
+        empty = intraday_data.iloc[0:0]
+        leg1_data = intraday_by_symbol.get(contract1_code, empty)
+        leg2_data = intraday_by_symbol.get(contract2_code, empty)
+        
+        # Join the legs on their sorted Timestamp index (keeps only timestamps both legs have)
+        price_columns = ['OPEN', 'HIGH', 'LOW', 'CLOSE', 'VOLUME']
+        merged_data = leg1_data.set_index('Timestamp')[['Date', 'Time'] + price_columns].join(
+            leg2_data.set_index('Timestamp')[price_columns],
+            how='inner',
+            lsuffix='_1',
+            rsuffix='_2'
+        ).reset_index()
+        
+        # Calculate spread prices, all four columns in a single array subtraction
+        merged_data[['OPEN_SPREAD', 'HIGH_SPREAD', 'LOW_SPREAD', 'CLOSE_SPREAD']] = (
+            merged_data[['OPEN_1', 'HIGH_1', 'LOW_1', 'CLOSE_1']].to_numpy()
+            - merged_data[['OPEN_2', 'HIGH_2', 'LOW_2', 'CLOSE_2']].to_numpy()
+        )
+        
+        # Add date_only for grouping
+        merged_data['date_only'] = merged_data['Date'].dt.date
+        
+        spread_bars[key] = merged_data
+    return spread_bars[key]
+
+
+@lru_cache(maxsize=256)
+def parse_date(date_str):
+    """Parse a YYYY-MM-DD date picker value, cached since callbacks repeat the same dates."""
+    return datetime.strptime(date_str, '%Y-%m-%d')
 
 # Available dates from the data
 available_dates = sorted(intraday_data['Date'].dt.date.unique())
@@ -51,6 +159,9 @@ available_dates = sorted(intraday_data['Date'].dt.date.unique())
 app = dash.Dash(__name__)
 app.title = "TTF Futures Visualizer"
 
+# Server-side cache for the data preparation shared by the visualization types
+cache = Cache(app.server, config={'CACHE_TYPE': 'SimpleCache'})
+
 # Layout
 app.layout = html.Div([
     html.H1("TTF Futures Visualization", style={'textAlign': 'center', 'marginTop': '20px', 'marginBottom': '20px'}),
@@ -208,6 +319,58 @@ app.layout = html.Div([
     ])
 ], style={'maxWidth': '1200px', 'margin': '0 auto', 'padding': '20px'})
 
+@cache.memoize(timeout=600)
+def prepare_contract_data(security_code, security_type, selected_date, days_to_show):
+    """
+    Resolve the security and build its intraday bars with the price change from previous close.
+    Returns (query result, bars, message), message is only set when there is nothing to plot.
+    """
+    # Validate the date string, it is already in the format the DataStore expects
+    end_date = parse_date(selected_date)
+    point_in_time = selected_date
+    
+    #  DataStore to get the specific contract for the selected security
+    result = datastore.query(security_code, security_type, point_in_time)
+    
+    if result.empty:
+        return result, None, f"No data found for {security_code} with type {security_type} on {point_in_time}."
+    
+    #  specific contract code
+    specific_contract = result['TFM_Code'].iloc[0]
+    
+    # Calculate the date range to display
+    start_date = end_date - timedelta(days=days_to_show)
+    
+    # Filter intraday data for  specific contract, date range
+    contract_data = get_contract_data(specific_contract, start_date, end_date)
+    
+    if contract_data.empty:
+        return result, None, f"No intraday data found for {specific_contract} in the selected date range."
+    
+    #  if string convert to datetime
+    if isinstance(contract_data['Date'].iloc[0], str):
+        contract_data['Date'] = pd.to_datetime(contract_data['Date'])
+    
+    # Group by date to get the previous day's close for each day
+    contract_data['date_only'] = contract_data['Date'].dt.date
+    daily_closes = contract_data.groupby('date_only')['CLOSE'].last()
+    prev_closes = daily_closes.shift(1)
+    
+    # Map back to get previous day's close for each bar
+    contract_data['prev_close'] = contract_data['date_only'].map(prev_closes)
+    
+    # For the first day in our data, we might not have a previous close
+    # In this case, use the first open price as the reference
+    if contract_data['prev_close'].isnull().any():
+        first_date = contract_data[contract_data['prev_close'].isnull()]['date_only'].min()
+        first_open = contract_data[contract_data['date_only'] == first_date]['OPEN'].iloc[0]
+        contract_data.loc[contract_data['date_only'] == first_date, 'prev_close'] = first_open
+    
+    # Calculate price change from previous close
+    contract_data['price_change'] = contract_data['CLOSE'] - contract_data['prev_close']
+    
+    return result, contract_data, None
+
 @callback(
     [Output('main-graph', 'figure'),
      Output('contract-info', 'children')],
@@ -222,91 +385,36 @@ def update_main_graph(security_type, security_code, selected_date, days_to_show,
         return {}, "Please enter a security code."
     
     try:
-        # Convert the date string to datetime
-        point_in_time = datetime.strptime(selected_date, '%Y-%m-%d').strftime('%Y-%m-%d')
+        result, contract_data, message = prepare_contract_data(security_code, security_type, selected_date, days_to_show)
         
-        #  DataStore to get the specific contract for the selected security
-        result = datastore.query(security_code, security_type, point_in_time)
-        
-        if result.empty:
-            return {}, f"No data found for {security_code} with type {security_type} on {point_in_time}."
+        if message:
+            return {}, message
         
         #  specific contract code
         specific_contract = result['TFM_Code'].iloc[0]
         
-        # Calculate the date range to display
-        end_date = datetime.strptime(selected_date, '%Y-%m-%d')
-        start_date = end_date - timedelta(days=days_to_show)
-        
-        # Filter intraday data for  specific contract, date range
-        contract_data = intraday_data[
-            (intraday_data['symbol'] == specific_contract) & 
-            (intraday_data['Date'] >= start_date.strftime('%Y-%m-%d')) &
-            (intraday_data['Date'] <= end_date.strftime('%Y-%m-%d'))
-        ].copy()
-        
-        if contract_data.empty:
-            return {}, f"No intraday data found for {specific_contract} in the selected date range."
-        
-        #  if string convert to datetime
-        if isinstance(contract_data['Date'].iloc[0], str):
-            contract_data['Date'] = pd.to_datetime(contract_data['Date'])
-        
-        # Extract hour from Time column and filter for 7:00 to 17:00
-        contract_data['hour'] = contract_data['Time'].str.split(':').str[0].astype(int)
-        contract_data = contract_data[(contract_data['hour'] >= 7) & (contract_data['hour'] <= 17)]
-        
-        # Group by date to get the previous day's close for each day
-        contract_data['date_only'] = contract_data['Date'].dt.date
-        daily_closes = contract_data.groupby('date_only')['CLOSE'].last().reset_index()
-        daily_closes['prev_close'] = daily_closes['CLOSE'].shift(1)
-        
-        # Merge back to get previous day's close for each bar
-        contract_data = pd.merge(
-            contract_data,
-            daily_closes[['date_only', 'prev_close']],
-            on='date_only',
-            how='left'
-        )
-        
-        # For the first day in our data, we might not have a previous close
-        # In this case, use the first open price as the reference
-        if contract_data['prev_close'].isnull().any():
-            first_date = contract_data[contract_data['prev_close'].isnull()]['date_only'].min()
-            first_open = contract_data[contract_data['date_only'] == first_date]['OPEN'].iloc[0]
-            contract_data.loc[contract_data['date_only'] == first_date, 'prev_close'] = first_open
-        
-        # Calculate price change from previous close
-        contract_data['price_change'] = contract_data['CLOSE'] - contract_data['prev_close']
-        
         # Create visualizations based on the selected type
         if viz_type == 'price_change':
             # Create a figure for price change from previous close
             fig = go.Figure()
             
-            # Get a list of unique dates for plotting
-            unique_dates = sorted(contract_data['date_only'].unique())
+            # Group the bars by day for plotting, rows are already in Timestamp order
+            days = contract_data.groupby('date_only', sort=True)
             
-            #  distinct colors
-            import plotly.express as px
-            colors = px.colors.qualitative.Plotly + px.colors.qualitative.Dark24
-            
-            # Define a list of marker symbols for variety
-            marker_symbols = ['circle', 'square', 'diamond', 'cross', 'x', 'triangle-up', 
-                             'triangle-down', 'star', 'pentagon', 'hexagon']
-            
-            # Add a trace for each day
-            for i, date in enumerate(unique_dates):
+            # Build one trace per day (the legend is the key to the days) and add them in one call
+            traces = []
+            for i, (date, day_data) in enumerate(days):
                 date_str = date.strftime('%Y-%m-%d')
-                day_data = contract_data[contract_data['date_only'] == date].sort_values('Time')
+                # Hand Plotly plain arrays rather than Series
+                times = day_data['Time'].to_numpy()
                 
                 # Choose color and marker symbol (cycling if more days than options)
-                color = colors[i % len(colors)]
-                symbol = marker_symbols[i % len(marker_symbols)]
+                color = COLORS[i % len(COLORS)]
+                symbol = MARKER_SYMBOLS[i % len(MARKER_SYMBOLS)]
                 
-                fig.add_trace(go.Scatter(
-                    x=day_data['Time'],  # Use Time directly for x-axis
-                    y=day_data['price_change'],
+                traces.append(go.Scattergl(
+                    x=times,  # Use Time directly for x-axis
+                    y=day_data['price_change'].to_numpy(),
                     mode='lines+markers',
                     name=date_str,
                     line=dict(color=color, width=2),
@@ -317,6 +425,7 @@ def update_main_graph(security_type, security_code, selected_date, days_to_show,
                         line=dict(width=1, color='white')
                     )
                 ))
+            fig.add_traces(traces)
             
             # Update layout with enhancements for better visibility
             fig.update_layout(
@@ -343,8 +452,7 @@ def update_main_graph(security_type, security_code, selected_date, days_to_show,
             fig.update_xaxes(
                 tickformat="%H:%M",
                 tickmode="array",
-                tickvals=["07:00", "08:00", "09:00", "10:00", "11:00", "12:00", 
-                          "13:00", "14:00", "15:00", "16:00", "17:00"],
+                tickvals=TICK_VALS,
                 range=["07:00", "17:00"]
             )
             
@@ -369,29 +477,26 @@ def update_main_graph(security_type, security_code, selected_date, days_to_show,
                 row_heights=[0.7, 0.3]
             )
             
-            # Get a list of unique dates for plotting
-            unique_dates = sorted(contract_data['date_only'].unique())
-            
-            # Get a color palette with enough distinct colors
-            import plotly.express as px
-            colors = px.colors.qualitative.Plotly + px.colors.qualitative.Dark24
+            # Group the bars by day for plotting, rows are already in Timestamp order
+            days = contract_data.groupby('date_only', sort=True)
             
             # Process data for each day - use unique colors for each day
-            for i, date in enumerate(unique_dates):
+            for i, (date, day_data) in enumerate(days):
                 date_str = date.strftime('%Y-%m-%d')
-                day_data = contract_data[contract_data['date_only'] == date].sort_values('Time')
+                # Hand Plotly plain arrays rather than Series
+                times = day_data['Time'].to_numpy()
                 
                 # Choose color (cycling if more days than colors)
-                color = colors[i % len(colors)]
+                color = COLORS[i % len(COLORS)]
                 
                 # Add OHLC candles with consistent color per day
                 fig.add_trace(
                     go.Candlestick(
-                        x=day_data['Time'],
-                        open=day_data['OPEN'],
-                        high=day_data['HIGH'],
-                        low=day_data['LOW'],
-                        close=day_data['CLOSE'],
+                        x=times,
+                        open=day_data['OPEN'].to_numpy(),
+                        high=day_data['HIGH'].to_numpy(),
+                        low=day_data['LOW'].to_numpy(),
+                        close=day_data['CLOSE'].to_numpy(),
                         name=date_str,
                         increasing=dict(line=dict(color=color)),
                         decreasing=dict(line=dict(color=color)),
@@ -403,8 +508,8 @@ def update_main_graph(security_type, security_code, selected_date, days_to_show,
                 # Add volume bars with matching colors
                 fig.add_trace(
                     go.Bar(
-                        x=day_data['Time'],
-                        y=day_data['VOLUME'],
+                        x=times,
+                        y=day_data['VOLUME'].to_numpy(),
                         name=f"Volume {date_str}",
                         marker_color=color,
                         showlegend=False,
@@ -436,8 +541,7 @@ def update_main_graph(security_type, security_code, selected_date, days_to_show,
             fig.update_xaxes(
                 tickformat="%H:%M",
                 tickmode="array",
-                tickvals=["07:00", "08:00", "09:00", "10:00", "11:00", "12:00", 
-                          "13:00", "14:00", "15:00", "16:00", "17:00"],
+                tickvals=TICK_VALS,
                 range=["07:00", "17:00"]
             )
             
@@ -451,7 +555,7 @@ def update_main_graph(security_type, security_code, selected_date, days_to_show,
                 html.Strong("Selected Contract: "), f"{security_code} ({security_type})", html.Br(),
                 html.Strong("Mapped to Specific: "), f"{specific_contract}", html.Br(),
                 html.Strong("Delivery Month: "), f"{result['delivery_month'].iloc[0]}", html.Br(),
-                html.Strong("Expiry Date: "), f"{result['expiry_date'].iloc[0]}"
+                html.Strong("Expiry Date: "), f"{result['expiry_date'].iloc[0]:%Y-%m-%d}"
             ])
         ])
         
@@ -461,6 +565,44 @@ def update_main_graph(security_type, security_code, selected_date, days_to_show,
         import traceback
         return {}, f"Error: {str(e)}\n{traceback.format_exc()}"
 
+@cache.memoize(timeout=600)
+def prepare_spread_data(spread_code, selected_date, days_to_show):
+    """
+    Resolve the spread legs and build the merged spread bars for the date range.
+    Returns (spread query result, bars, message), message is only set when there is nothing to plot.
+    """
+    # Validate the date string, it is already in the format the DataStore expects
+    end_date = parse_date(selected_date)
+    point_in_time = selected_date
+    
+    # Query for the spread contract details
+    spread_result = datastore.query(spread_code, "spread", point_in_time)
+    
+    if spread_result.empty:
+        return spread_result, None, f"No data found for spread {spread_code} on {point_in_time}."
+    
+    # Get the contract codes for both legs
+    contract1_code = spread_result['contract1_code'].iloc[0]
+    contract2_code = spread_result['contract2_code'].iloc[0]
+    
+    # Calculate the date range to display
+    start_date = end_date - timedelta(days=days_to_show)
+    
+    # Check each leg has intraday data in the date range
+    if get_contract_data(contract1_code, start_date, end_date).empty:
+        return spread_result, None, f"No intraday data found for the first leg of the spread ({contract1_code}) in the selected date range."
+    
+    if get_contract_data(contract2_code, start_date, end_date).empty:
+        return spread_result, None, f"No intraday data found for the second leg of the spread ({contract2_code}) in the selected date range."
+    
+    # Spread bars of the leg pair for the date range
+    merged_data = slice_date_range(get_spread_bars(contract1_code, contract2_code), start_date, end_date)
+    
+    if merged_data.empty:
+        return spread_result, None, f"No matching timestamps found for both legs of the spread in the selected date range."
+    
+    return spread_result, merged_data, None
+
 # Add callback for the spread tab
 @callback(
     [Output('spread-graph', 'figure'),
@@ -478,93 +620,43 @@ def update_spread_graph(spread_code, selected_date, days_to_show, viz_type):
         return {}, "Please select a spread type."
     
     try:
-        # Convert the date string to datetime
-        point_in_time = datetime.strptime(selected_date, '%Y-%m-%d').strftime('%Y-%m-%d')
+        spread_result, merged_data, message = prepare_spread_data(spread_code, selected_date, days_to_show)
         
-        # Query for the spread contract details
-        spread_result = datastore.query(spread_code, "spread", point_in_time)
-        
-        if spread_result.empty:
-            return {}, f"No data found for spread {spread_code} on {point_in_time}."
+        if message:
+            return {}, message
         
         # Get the contract codes for both legs
         contract1_code = spread_result['contract1_code'].iloc[0]
         contract2_code = spread_result['contract2_code'].iloc[0]
         spread_type = spread_result['spread_type'].iloc[0]
         
-        # Calculate the date range to display
-        end_date = datetime.strptime(selected_date, '%Y-%m-%d')
-        start_date = end_date - timedelta(days=days_to_show)
-        
-        # Filter intraday data for the date range
-        date_filtered_data = intraday_data[
-            (intraday_data['Date'] >= start_date.strftime('%Y-%m-%d')) &
-            (intraday_data['Date'] <= end_date.strftime('%Y-%m-%d'))
-        ].copy()
-        
-        # Filter for each leg
-        leg1_data = date_filtered_data[date_filtered_data['symbol'] == contract1_code].copy()
-        leg2_data = date_filtered_data[date_filtered_data['symbol'] == contract2_code].copy()
-        
-        if leg1_data.empty:
-            return {}, f"No intraday data found for the first leg of the spread ({contract1_code}) in the selected date range."
-        
-        if leg2_data.empty:
-            return {}, f"No intraday data found for the second leg of the spread ({contract2_code}) in the selected date range."
-        
-        # Merge the data on Timestamp
-        # Make sure they have the same timestamps
-        merged_data = pd.merge(
-            leg1_data[['Timestamp', 'Date', 'Time', 'OPEN', 'HIGH', 'LOW', 'CLOSE', 'VOLUME']],
-            leg2_data[['Timestamp', 'OPEN', 'HIGH', 'LOW', 'CLOSE', 'VOLUME']],
-            on='Timestamp',
-            suffixes=('_1', '_2')
-        )
-        
-        if merged_data.empty:
-            return {}, f"No matching timestamps found for both legs of the spread in the selected date range."
-        
-        # Calculate spread prices
-        merged_data['OPEN_SPREAD'] = merged_data['OPEN_1'] - merged_data['OPEN_2']
-        merged_data['HIGH_SPREAD'] = merged_data['HIGH_1'] - merged_data['HIGH_2']
-        merged_data['LOW_SPREAD'] = merged_data['LOW_1'] - merged_data['LOW_2']
-        merged_data['CLOSE_SPREAD'] = merged_data['CLOSE_1'] - merged_data['CLOSE_2']
-        
-        # Extract hour from Time column and filter for 7:00 to 17:00
-        merged_data['hour'] = merged_data['Time'].str.split(':').str[0].astype(int)
-        merged_data = merged_data[(merged_data['hour'] >= 7) & (merged_data['hour'] <= 17)]
-        
-        # Add date_only for grouping
-        merged_data['date_only'] = merged_data['Date'].dt.date
-        
-        # Get unique dates
-        unique_dates = sorted(merged_data['date_only'].unique())
-        
-        # Use a color palette
-        import plotly.express as px
-        colors = px.colors.qualitative.Plotly + px.colors.qualitative.Dark24
+        # Group the bars by day, rows are already in Timestamp order
+        days = merged_data.groupby('date_only', sort=True)
         
         # Create the visualization based on the selected type
         if viz_type == 'spread_price':
             # Create a figure for spread price
             fig = go.Figure()
             
-            # Add a trace for each day
-            for i, date in enumerate(unique_dates):
+            # Build one trace per day and add them in one call
+            traces = []
+            for i, (date, day_data) in enumerate(days):
                 date_str = date.strftime('%Y-%m-%d')
-                day_data = merged_data[merged_data['date_only'] == date].sort_values('Time')
+                # Hand Plotly plain arrays rather than Series
+                times = day_data['Time'].to_numpy()
                 
                 # Choose color
-                color = colors[i % len(colors)]
+                color = COLORS[i % len(COLORS)]
                 
-                fig.add_trace(go.Scatter(
-                    x=day_data['Time'],
-                    y=day_data['CLOSE_SPREAD'],
+                traces.append(go.Scattergl(
+                    x=times,
+                    y=day_data['CLOSE_SPREAD'].to_numpy(),
                     mode='lines+markers',
                     name=date_str,
                     line=dict(color=color, width=2),
                     marker=dict(size=8)
                 ))
+            fig.add_traces(traces)
             
             # Update layout
             fig.update_layout(
@@ -590,8 +682,7 @@ def update_spread_graph(spread_code, selected_date, days_to_show, viz_type):
             fig.update_xaxes(
                 tickformat="%H:%M",
                 tickmode="array",
-                tickvals=["07:00", "08:00", "09:00", "10:00", "11:00", "12:00", 
-                          "13:00", "14:00", "15:00", "16:00", "17:00"],
+                tickvals=TICK_VALS,
                 range=["07:00", "17:00"]
             )
             
@@ -621,18 +712,19 @@ def update_spread_graph(spread_code, selected_date, days_to_show, viz_type):
             )
             
             # Add a trace for each day and each leg
-            for i, date in enumerate(unique_dates):
+            for i, (date, day_data) in enumerate(days):
                 date_str = date.strftime('%Y-%m-%d')
-                day_data = merged_data[merged_data['date_only'] == date].sort_values('Time')
+                # Hand Plotly plain arrays rather than Series
+                times = day_data['Time'].to_numpy()
                 
                 # Choose color
-                color = colors[i % len(colors)]
+                color = COLORS[i % len(COLORS)]
                 
                 # Add trace for leg 1
                 fig.add_trace(
-                    go.Scatter(
-                        x=day_data['Time'],
-                        y=day_data['CLOSE_1'],
+                    go.Scattergl(
+                        x=times,
+                        y=day_data['CLOSE_1'].to_numpy(),
                         mode='lines',
                         name=f"{date_str} (Leg 1)",
                         line=dict(color=color),
@@ -643,9 +735,9 @@ def update_spread_graph(spread_code, selected_date, days_to_show, viz_type):
                 
                 # Add trace for leg 2
                 fig.add_trace(
-                    go.Scatter(
-                        x=day_data['Time'],
-                        y=day_data['CLOSE_2'],
+                    go.Scattergl(
+                        x=times,
+                        y=day_data['CLOSE_2'].to_numpy(),
                         mode='lines',
                         name=f"{date_str} (Leg 2)",
                         line=dict(color=color, dash='dash'),
@@ -656,9 +748,9 @@ def update_spread_graph(spread_code, selected_date, days_to_show, viz_type):
                 
                 # Add trace for spread
                 fig.add_trace(
-                    go.Scatter(
-                        x=day_data['Time'],
-                        y=day_data['CLOSE_SPREAD'],
+                    go.Scattergl(
+                        x=times,
+                        y=day_data['CLOSE_SPREAD'].to_numpy(),
                         mode='lines',
                         name=f"{date_str} (Spread)",
                         line=dict(color=color, dash='dot'),
@@ -691,8 +783,7 @@ def update_spread_graph(spread_code, selected_date, days_to_show, viz_type):
                 fig.update_xaxes(
                     tickformat="%H:%M",
                     tickmode="array",
-                    tickvals=["07:00", "08:00", "09:00", "10:00", "11:00", "12:00", 
-                              "13:00", "14:00", "15:00", "16:00", "17:00"],
+                    tickvals=TICK_VALS,
                     range=["07:00", "17:00"],
                     row=i, col=1
                 )
@@ -702,8 +793,8 @@ def update_spread_graph(spread_code, selected_date, days_to_show, viz_type):
             html.H5(f"Spread Information:"),
             html.P([
                 html.Strong("Selected Spread: "), f"{spread_code} ({spread_type})", html.Br(),
-                html.Strong("Leg 1: "), f"{contract1_code} (Expiry: {spread_result['contract1_expiry'].iloc[0]})", html.Br(),
-                html.Strong("Leg 2: "), f"{contract2_code} (Expiry: {spread_result['contract2_expiry'].iloc[0]})", html.Br(),
+                html.Strong("Leg 1: "), f"{contract1_code} (Expiry: {spread_result['contract1_expiry'].iloc[0]:%Y-%m-%d})", html.Br(),
+                html.Strong("Leg 2: "), f"{contract2_code} (Expiry: {spread_result['contract2_expiry'].iloc[0]:%Y-%m-%d})", html.Br(),
                 html.Strong("Current Spread Value: "), f"{merged_data['CLOSE_SPREAD'].iloc[-1]:.2f} (as of {merged_data['Time'].iloc[-1]} on {merged_data['Date'].iloc[-1].strftime('%Y-%m-%d')})"
             ])
         ])
@@ -1,11 +1,72 @@
 import pandas as pd
+import numpy as np
 import re
+import logging
+import sys
 import pickle
 import os
 from datetime import datetime
 from enum import Enum
 from typing import Optional, Union, Tuple
 
+logger = logging.getLogger(__name__)
+
+# Exchange prefix on the raw TFM codes
+_TFM_PREFIX = 'ENDEX::F:'
+
+# Contract code patterns
+_TFM_CONTRACT_RE = re.compile(r'.*TFM\\([FGHJKMNQUVXZ])(\d{2})')  # specific, e.g. TFM\J25
+_GENERIC_RE = re.compile(r'TFM(\d+)')  # generic, e.g. TFM1
+_MONTHLY_RE = re.compile(r'TFM([A-Za-z]+)(\d+)')  # monthly generic, e.g. TFMAPR1
+_SPREAD_RE = re.compile(r'TFM([A-Z]{3})([A-Z]{3})(\d+)')  # spread, e.g. TFMDECJUN1
+
+# Futures month codes to month names
+_MONTH_CODE_TO_NAME = {
+    'F': 'January', 'G': 'February', 'H': 'March', 'J': 'April',
+    'K': 'May', 'M': 'June', 'N': 'July', 'Q': 'August',
+    'U': 'September', 'V': 'October', 'X': 'November', 'Z': 'December'
+}
+
+# Month abbreviations to month names, in calendar order
+_MONTH_ABBR_TO_NAME = {
+    'JAN': 'January', 'FEB': 'February', 'MAR': 'March', 'APR': 'April',
+    'MAY': 'May', 'JUN': 'June', 'JUL': 'July', 'AUG': 'August',
+    'SEP': 'September', 'OCT': 'October', 'NOV': 'November', 'DEC': 'December'
+}
+
+# Month names to month abbreviations
+_MONTH_NAME_TO_ABBR = {name: abbr for abbr, name in _MONTH_ABBR_TO_NAME.items()}
+
+# Calendar position (0 = January) of futures month codes and month abbreviations
+_MONTH_CODE_TO_IDX = {code: idx for idx, code in enumerate(_MONTH_CODE_TO_NAME)}
+_MONTH_ABBR_TO_IDX = {abbr: idx for idx, abbr in enumerate(_MONTH_ABBR_TO_NAME)}
+
+# Per-month arrays used to select monthly generic contracts by position
+_MONTH_ARRAY_DTYPE = np.dtype([('contract_year', 'int32'), ('expiry_date', 'datetime64[ns]')])
+
+def _bar_timestamps(dates, times):
+    """
+    Combine a datetime Date column with an HH:MM or HH:MM:SS Time column
+    """
+    # Parse each distinct bar time once and add it to the dates as a timedelta
+    times = times.astype(str)
+    unique_times = pd.Series(times.unique())
+    offsets = pd.to_timedelta(unique_times.where(unique_times.str.count(':') > 1, unique_times + ':00'))
+    return dates + times.map(dict(zip(unique_times, offsets)))
+
+def _spread_ohlcv(leg1, leg2):
+    """
+    Spread bars from two aligned (N, 5) OPEN/HIGH/LOW/CLOSE/VOLUME arrays:
+    price columns leg1 - leg2, volume the average of both legs
+    """
+    # Write everything into one preallocated buffer instead of a new array per column
+    # (already free of temporaries, so DataFrame.eval/numexpr would add a dependency for no gain)
+    out = np.empty(leg1.shape, dtype='float64')
+    np.subtract(leg1[:, :4], leg2[:, :4], out=out[:, :4])
+    np.add(leg1[:, 4], leg2[:, 4], out=out[:, 4])
+    out[:, 4] *= 0.5
+    return out
+
 class SecurityType(Enum):
     SPECIFIC = "specific"
     GENERIC = "generic"
@@ -18,9 +79,17 @@ class DataStore:
         if pickle_file and os.path.exists(pickle_file):
             self.load_from_pickle(pickle_file)
         elif csv_file:
-            # Load and clean the data
-            self.df = pd.read_csv(csv_file, delimiter=';')
+            # Load and clean the data (dates parsed by the C reader as it goes)
+            self.df = pd.read_csv(
+                csv_file,
+                delimiter=';',
+                dtype={'TFM_Code': str},
+                parse_dates=['contract_month', 'expiry_date'],
+                cache_dates=True,
+                engine='c'
+            )
             self.df = self.clean_data()
+            self.build_lookups()
         else:
             raise ValueError("Either csv_file or pickle_file must be provided")
         
@@ -28,45 +97,115 @@ class DataStore:
         """
         Parse TFM_Code to extract the month and year.
         """
-        match = re.match(r'.*TFM\\([FGHJKMNQUVXZ])(\d{2})', tfm_code)
+        match = _TFM_CONTRACT_RE.match(tfm_code)
         if match:
             month_code, year = match.groups()
-            month_map = {
-                'F': 'January', 'G': 'February', 'H': 'March', 'J': 'April',
-                'K': 'May', 'M': 'June', 'N': 'July', 'Q': 'August',
-                'U': 'September', 'V': 'October', 'X': 'November', 'Z': 'December'
-            }
-            month = month_map[month_code]
+            month = _MONTH_CODE_TO_NAME[month_code]
             return f"{month} 20{year}"
         return None
     
+    def tfm_code_original(self, tfm_code):
+        """
+        Return the TFM_Code with its exchange prefix, as in the source data (e.g. ENDEX::F:TFM\\J25).
+        """
+        return _TFM_PREFIX + tfm_code
+    
     def clean_data(self):
         """
         Cleans and formats the data.
         """
-        # Remove "ENDEX::F:" prefix from TFM_Code
-        self.df['TFM_Code_original'] = self.df['TFM_Code']  # Keep original for reference
-        self.df['TFM_Code'] = self.df['TFM_Code'].str.replace('ENDEX::F:', '', regex=False)
+        # Remove "ENDEX::F:" prefix from TFM_Code (see tfm_code_original to add it back)
+        self.df['TFM_Code'] = self.df['TFM_Code'].str.replace(_TFM_PREFIX, '', regex=False)
         
-        # Extract delivery month using TFM_Code
-        self.df['delivery_month'] = self.df['TFM_Code'].apply(self.parse_contract)
+        # Extract delivery month using TFM_Code (same pattern as parse_contract, vectorized)
+        codes = self.df['TFM_Code'].str.extract(_TFM_CONTRACT_RE)
+        self.df['delivery_month'] = codes[0].map(_MONTH_CODE_TO_NAME) + ' 20' + codes[1]
         
-        # Standardize dates
-        self.df['contract_month'] = pd.to_datetime(self.df['contract_month']).dt.strftime('%Y-%m')
-        self.df['expiry_date'] = pd.to_datetime(self.df['expiry_date']).dt.strftime('%Y-%m-%d')
+        # Standardize dates (parsed on read), kept as timezone-naive datetime64 so queries can compare them directly
+        self.df['contract_month'] = self.df['contract_month'].dt.tz_localize(None)
+        self.df['expiry_date'] = self.df['expiry_date'].dt.tz_localize(None)
         
         # Extract month name for monthly generic queries
         self.df['month_name'] = pd.to_datetime(self.df['delivery_month'], errors='coerce').dt.strftime('%B')
         
+        # Calendar month index (0-11, -1 if the code can't be parsed) for fast month lookups
+        self.df['month_idx'] = codes[0].map(_MONTH_CODE_TO_IDX).fillna(-1).astype('int8')
+        
         # Extract contract year 
-        self.df['contract_year'] = pd.to_datetime(self.df['contract_month']).dt.year
+        self.df['contract_year'] = self.df['contract_month'].dt.year
         
         # Retain relevant columns
-        self.df = self.df[['TFM_Code', 'TFM_Code_original', 'delivery_month', 
-                           'contract_month', 'expiry_date', 'month_name', 'contract_year']]
+        self.df = self.df[['TFM_Code', 'delivery_month', 
+                           'contract_month', 'expiry_date', 'month_name', 'month_idx', 'contract_year']]
+        
+        # Store the string columns as categoricals (one copy of each distinct value, small integer codes)
+        for column in ['TFM_Code', 'delivery_month', 'month_name']:
+            self.df[column] = self.df[column].astype('category')
         
         return self.df
     
+    def build_lookups(self):
+        """
+        Pre-group the cleaned data for the specific, monthly generic and spread queries.
+        - row positions of each TFM_Code
+        - by month index, each group sorted by expiry date (and so by contract year), with a
+          parallel array of (contract_year, expiry_date) for binary search and positional selection
+        - by (month index, contract year)
+        """
+        self._tfm_code_positions = self.df.groupby('TFM_Code', observed=True).indices
+        self._by_month = {
+            month_idx: month_df.sort_values(['expiry_date', 'contract_year'])
+            for month_idx, month_df in self.df.groupby('month_idx')
+        }
+        self._by_month_np = {}
+        for month_idx, month_df in self._by_month.items():
+            month_np = np.empty(len(month_df), dtype=_MONTH_ARRAY_DTYPE)
+            month_np['contract_year'] = month_df['contract_year'].to_numpy()
+            month_np['expiry_date'] = month_df['expiry_date'].to_numpy()
+            self._by_month_np[month_idx] = month_np
+        self._by_month_year = {
+            (month_idx, int(contract_year)): month_year_df
+            for (month_idx, contract_year), month_year_df in self.df.groupby(['month_idx', 'contract_year'])
+        }
+    
+    def _point_in_time_bounds(self, point_in_time):
+        """
+        Expiry date bounds for a point-in-time query.
+        point_in_time can be a single date (expiring on or after it) or a (start_date, end_date) tuple.
+        Returns (start_date, end_date); end_date is None for a single date, both are None without point_in_time.
+        The start date is the query's reference date.
+        """
+        if not point_in_time:
+            return None, None
+        if isinstance(point_in_time, tuple) and len(point_in_time) == 2:
+            start_date, end_date = point_in_time
+            return pd.to_datetime(start_date), pd.to_datetime(end_date)
+        # Single date point-in-time query
+        return pd.to_datetime(point_in_time), None
+    
+    def _point_in_time_mask(self, expiry_dates, point_in_time):
+        """
+        Expiry date mask for a point-in-time query.
+        Returns the mask and the reference date (both None without point_in_time).
+        """
+        start_date, end_date = self._point_in_time_bounds(point_in_time)
+        if start_date is None:
+            return None, None
+        mask = expiry_dates >= start_date
+        if end_date is not None:
+            mask &= expiry_dates <= end_date
+        return mask, start_date
+    
+    def _filter_point_in_time(self, df, point_in_time):
+        """
+        Filter contracts by expiry date for a point-in-time query.
+        Returns the filtered DataFrame and the reference date (None without point_in_time).
+        """
+        mask, reference_date = self._point_in_time_mask(df['expiry_date'], point_in_time)
+        if mask is not None:
+            df = df[mask]
+        return df, reference_date
+    
     def query(self, security: str, security_type: Union[SecurityType, str], point_in_time: Optional[Union[str, Tuple[str, str]]] = None):
         """
         Unified query interface that accepts three parameters:
@@ -81,142 +220,141 @@ class DataStore:
         if isinstance(security_type, str):
             security_type = SecurityType(security_type)
         
-        # Create a copy of the DataFrame to work with
-        result_df = self.df.copy()
-        
-        # Apply point-in-time filtering if provided
-        reference_date = None
-        if point_in_time:
-            if isinstance(point_in_time, tuple) and len(point_in_time) == 2:
-                start_date, end_date = point_in_time
-                reference_date = pd.to_datetime(start_date)
-                result_df = result_df[
-                    (pd.to_datetime(result_df['expiry_date']) >= pd.to_datetime(start_date)) &
-                    (pd.to_datetime(result_df['expiry_date']) <= pd.to_datetime(end_date))
-                ]
-            else:
-                # Single date point-in-time query
-                reference_date = pd.to_datetime(point_in_time)
-                result_df = result_df[pd.to_datetime(result_df['expiry_date']) >= reference_date]
-        
-        # Apply security-specific filtering based on type
-        if security_type == SecurityType.SPECIFIC:
-            # Handle case with or without prefix
-            clean_security = security.replace('ENDEX::F:', '', 1)
-            return result_df[result_df['TFM_Code'] == clean_security]
-        
-        elif security_type == SecurityType.GENERIC:
-            # Extract sequence number from generic code (e.g., TFM1 -> 1)
-            match = re.match(r'TFM(\d+)', security)
-            if match:
-                sequence_number = int(match.group(1))
-                return result_df.sort_values('contract_month').iloc[sequence_number-1:sequence_number]
-            return pd.DataFrame()  # Return empty DataFrame if no match
-        
-        elif security_type == SecurityType.MONTHLY_GENERIC:
-            # Handle monthly generics like TFMAPR1
-            month_pattern = r'TFM([A-Za-z]+)(\d+)'
-            match = re.match(month_pattern, security)
+        return self._DISPATCH[security_type](self, security, point_in_time)
+    
+    def _query_specific(self, security, point_in_time):
+        """
+        Specific contract by TFM_Code, e.g. TFM\\J25 (with or without the ENDEX::F: prefix).
+        """
+        # Handle case with or without prefix
+        clean_security = security.replace(_TFM_PREFIX, '', 1)
+        positions = self._tfm_code_positions.get(clean_security, [])
+        specific_df, _ = self._filter_point_in_time(self.df.take(positions), point_in_time)
+        return specific_df
+    
+    def _query_generic(self, security, point_in_time):
+        """
+        Nth active contract, e.g. TFM1.
+        """
+        # Extract sequence number from generic code (e.g., TFM1 -> 1)
+        match = _GENERIC_RE.match(security)
+        if match:
+            sequence_number = int(match.group(1))
+            # Apply point-in-time filtering if provided
+            # (filters and slices return new frames, so self.df is never modified)
+            result_df, _ = self._filter_point_in_time(self.df, point_in_time)
+            return result_df.sort_values('contract_month').iloc[sequence_number-1:sequence_number]
+        return pd.DataFrame()  # Return empty DataFrame if no match
+    
+    def _query_monthly_generic(self, security, point_in_time):
+        """
+        Nth active contract of a delivery month, e.g. TFMAPR1.
+        """
+        # Handle monthly generics like TFMAPR1
+        match = _MONTHLY_RE.match(security)
+        
+        if match:
+            month_abbr, sequence_str = match.groups()
+            sequence_number = int(sequence_str)
             
-            if match:
-                month_abbr, sequence_str = match.groups()
-                sequence_number = int(sequence_str)
+            # Map month abbreviation to full month name
+            month_abbr = month_abbr.upper()
+            
+            if month_abbr in _MONTH_ABBR_TO_NAME:
+                month_name = _MONTH_ABBR_TO_NAME[month_abbr]
+                
+                logger.debug("Looking for %s contract, sequence %s", month_name, sequence_number)
                 
-                # Map month abbreviation to full month name
-                month_abbr = month_abbr.upper()
-                month_map = {
-                    'JAN': 'January', 'FEB': 'February', 'MAR': 'March', 'APR': 'April',
-                    'MAY': 'May', 'JUN': 'June', 'JUL': 'July', 'AUG': 'August',
-                    'SEP': 'September', 'OCT': 'October', 'NOV': 'November', 'DEC': 'December'
+                # Store the month name in the result attributes for later use
+                month_info = {
+                    'month_name': month_name,
+                    'month_abbr': month_abbr
                 }
                 
-                if month_abbr in month_map:
-                    month_name = month_map[month_abbr]
+                # Contracts of this month (pre-sorted by expiry), selected by position on their
+                # (contract_year, expiry_date) array; only the chosen row is materialized
+                month_idx = _MONTH_ABBR_TO_IDX[month_abbr]
+                month_df = self._by_month.get(month_idx, self.df.iloc[0:0])
+                month_np = self._by_month_np.get(month_idx, np.empty(0, dtype=_MONTH_ARRAY_DTYPE))
+                expiry_dates = month_np['expiry_date']
+                
+                # Apply the same point-in-time filter, as a binary search on the sorted expiries
+                reference_date, end_date = self._point_in_time_bounds(point_in_time)
+                first = 0
+                stop = len(expiry_dates)
+                if reference_date is not None:
+                    first = np.searchsorted(expiry_dates, np.datetime64(reference_date, 'ns'), side='left')
+                if end_date is not None:
+                    stop = np.searchsorted(expiry_dates, np.datetime64(end_date, 'ns'), side='right')
+                positions = np.arange(first, stop)
+                
+                logger.debug("Found %s %s contracts", len(positions), month_name)
+                
+                if reference_date is not None:
+                    # Get the reference year
+                    reference_year = reference_date.year
                     
-                    print(f"Looking for {month_name} contract, sequence {sequence_number}")
+                    # Find all contracts for this month that haven't expired yet
+                    valid_start = np.searchsorted(expiry_dates, np.datetime64(reference_date, 'ns'), side='right')
+                    valid_positions = np.arange(valid_start, stop)
                     
-                    # Store the month name in the result attributes for later use
-                    month_info = {
-                        'month_name': month_name,
-                        'month_abbr': month_abbr
-                    }
+                    logger.debug("Found %s valid (non-expired) contracts for %s", len(valid_positions), month_name)
+                    if len(valid_positions) and logger.isEnabledFor(logging.DEBUG):
+                        valid_contracts = month_df.take(valid_positions)
+                        logger.debug("\n".join(
+                            "  - " + valid_contracts['TFM_Code'].astype(str)
+                            + " expires on " + valid_contracts['expiry_date'].dt.strftime('%Y-%m-%d')
+                        ))
                     
-                    # Filter by month name
-                    monthly_df = result_df[result_df['month_name'] == month_name]
+                    # Add metadata about expired contracts
+                    metadata = {
+                        'expired_contracts': [],
+                        'next_available': None,
+                        'month_info': month_info
+                    }
                     
-                    print(f"Found {len(monthly_df)} {month_name} contracts")
+                    # Check if the current year's contract has expired
+                    current_year_positions = positions[month_np['contract_year'][positions] == reference_year]
+                    if len(current_year_positions):
+                        current_year_expiry = pd.Timestamp(expiry_dates[current_year_positions[0]])
+                        if current_year_expiry < reference_date:
+                            # Current year contract has expired
+                            metadata['expired_contracts'].append({
+                                'year': reference_year,
+                                'expiry_date': current_year_expiry.strftime('%Y-%m-%d')
+                            })
+                            
+                            logger.debug("NOTE: %s %s contract has expired on %s", month_name, reference_year, current_year_expiry.date())
                     
-                    if reference_date is not None:
-                        # Get the reference year
-                        reference_year = reference_date.year
-                        
-                        # Find all contracts for this month that haven't expired yet
-                        valid_contracts = monthly_df[
-                            pd.to_datetime(monthly_df['expiry_date']) > reference_date
-                        ].sort_values('contract_year')
+                    # Take the Nth contract that hasn't expired
+                    if len(valid_positions) >= sequence_number:
+                        result = month_df.take(valid_positions[sequence_number-1:sequence_number])
                         
-                        print(f"Found {len(valid_contracts)} valid (non-expired) contracts for {month_name}")
-                        if not valid_contracts.empty:
-                            for i, row in valid_contracts.iterrows():
-                                print(f"  - {row['TFM_Code']} expires on {row['expiry_date']}")
-                        
-                        # Add metadata about expired contracts
-                        metadata = {
-                            'expired_contracts': [],
-                            'next_available': None,
-                            'month_info': month_info
-                        }
-                        
-                        # Check if the current year's contract has expired
-                        current_year_contract = monthly_df[monthly_df['contract_year'] == reference_year]
-                        if not current_year_contract.empty:
-                            current_year_expiry = pd.to_datetime(current_year_contract['expiry_date'].iloc[0])
-                            if current_year_expiry < reference_date:
-                                # Current year contract has expired
-                                metadata['expired_contracts'].append({
-                                    'year': reference_year,
-                                    'expiry_date': current_year_expiry.strftime('%Y-%m-%d')
-                                })
-                                
-                                print(f"NOTE: {month_name} {reference_year} contract has expired on {current_year_expiry.strftime('%Y-%m-%d')}")
-                        
-                        # Take the Nth contract that hasn't expired
-                        if len(valid_contracts) >= sequence_number:
-                            result = valid_contracts.iloc[sequence_number-1:sequence_number].copy()
-                            
-                            # Add metadata about the selected contract
-                            if not result.empty:
-                                metadata['next_available'] = {
-                                    'year': result['contract_year'].iloc[0],
-                                    'expiry_date': result['expiry_date'].iloc[0]
-                                }
-                                
-                                print(f"Using {month_name} {result['contract_year'].iloc[0]} (expires on {result['expiry_date'].iloc[0]})")
+                        # Add metadata about the selected contract
+                        if not result.empty:
+                            metadata['next_available'] = {
+                                'year': result['contract_year'].iloc[0],
+                                'expiry_date': result['expiry_date'].iloc[0].strftime('%Y-%m-%d')
+                            }
                             
-                            # Add metadata to the result
-                            result.attrs['metadata'] = metadata
-                            return result
-                        else:
-                            print(f"WARNING: Not enough valid contracts for {month_name} (sequence {sequence_number}). Only found {len(valid_contracts)}.")
-                            return pd.DataFrame()  # Not enough valid contracts
-                            
-                    # If no reference date, just sort by year and take the Nth contract
-                    sorted_df = monthly_df.sort_values('contract_year')
-                    if len(sorted_df) >= sequence_number:
-                        result = sorted_df.iloc[sequence_number-1:sequence_number].copy()
-                        # Add basic metadata
-                        result.attrs['metadata'] = {'month_info': month_info}
+                            logger.debug("Using %s %s (expires on %s)", month_name, result['contract_year'].iloc[0], result['expiry_date'].iloc[0].date())
+                        
+                        # Add metadata to the result
+                        result.attrs['metadata'] = metadata
                         return result
-            
-            print(f"Could not match {security} as a monthly generic code")
-            return pd.DataFrame()  # Return empty DataFrame if no match
-            
-        elif security_type == SecurityType.SPREAD:
-            # Handle spread codes like TFMDECJUN1
-            return self.query_spread(security, point_in_time)
-        
-        # Default fallback
-        return pd.DataFrame()
+                    else:
+                        logger.debug("WARNING: Not enough valid contracts for %s (sequence %s). Only found %s.", month_name, sequence_number, len(valid_positions))
+                        return pd.DataFrame()  # Not enough valid contracts
+                        
+                # If no reference date, just take the Nth contract by year
+                if len(positions) >= sequence_number:
+                    result = month_df.take(positions[sequence_number-1:sequence_number])
+                    # Add basic metadata
+                    result.attrs['metadata'] = {'month_info': month_info}
+                    return result
+        
+        logger.debug("Could not match %s as a monthly generic code", security)
+        return pd.DataFrame()  # Return empty DataFrame if no match
     
     def query_spread(self, spread_code: str, point_in_time: Optional[str] = None):
         """
@@ -231,40 +369,32 @@ class DataStore:
             DataFrame with  specific contracts that make up the spread
         """
         # Parse the spread code (e.g., TFMDECJUN1)
-        spread_pattern = r'TFM([A-Z]{3})([A-Z]{3})(\d+)'
-        match = re.match(spread_pattern, spread_code)
+        match = _SPREAD_RE.match(spread_code)
         
         if not match:
-            print(f"Invalid spread code format: {spread_code}")
+            logger.debug("Invalid spread code format: %s", spread_code)
             return pd.DataFrame()
         
         # Extract the two months and sequence number
         month1_abbr, month2_abbr, seq_num = match.groups()
         sequence_number = int(seq_num)
         
-        # Map month abbreviations to full month names
-        month_map = {
-            'JAN': 'January', 'FEB': 'February', 'MAR': 'March', 'APR': 'April',
-            'MAY': 'May', 'JUN': 'June', 'JUL': 'July', 'AUG': 'August',
-            'SEP': 'September', 'OCT': 'October', 'NOV': 'November', 'DEC': 'December'
-        }
-        
-        if month1_abbr not in month_map or month2_abbr not in month_map:
-            print(f"Invalid month abbreviation in spread code: {spread_code}")
+        if month1_abbr not in _MONTH_ABBR_TO_NAME or month2_abbr not in _MONTH_ABBR_TO_NAME:
+            logger.debug("Invalid month abbreviation in spread code: %s", spread_code)
             return pd.DataFrame()
         
         # Get the full month names
-        month1_full = month_map[month1_abbr]
-        month2_full = month_map[month2_abbr]
+        month1_full = _MONTH_ABBR_TO_NAME[month1_abbr]
+        month2_full = _MONTH_ABBR_TO_NAME[month2_abbr]
         
-        print(f"Processing spread {spread_code}: {month1_full}-{month2_full} (sequence {sequence_number})")
+        logger.debug("Processing spread %s: %s-%s (sequence %s)", spread_code, month1_full, month2_full, sequence_number)
         
         # Query for the first month contract using monthly generic
         month1_query = f"TFM{month1_abbr}{sequence_number}"
         contract1 = self.query(month1_query, SecurityType.MONTHLY_GENERIC, point_in_time)
         
         if contract1.empty:
-            print(f"Could not find first leg of spread: {month1_query}")
+            logger.debug("Could not find first leg of spread: %s", month1_query)
             return pd.DataFrame()
         
         # For the second leg, we need special logic
@@ -276,30 +406,26 @@ class DataStore:
             
             # For DEC-JUN: If month2 comes before month1 in calendar, use next year
             # For DEC-DEC: Always use next year for month2
-            month_order = list(month_map.values())
-            month1_idx = month_order.index(month1_full)
-            month2_idx = month_order.index(month2_full)
+            month1_idx = _MONTH_ABBR_TO_IDX[month1_abbr]
+            month2_idx = _MONTH_ABBR_TO_IDX[month2_abbr]
             
             # If month2 comes before or is the same as month1 in the calendar, use next year
             year2 = year1
             if month2_idx <= month1_idx:
                 year2 = year1 + 1
-                print(f"Second leg will use next year: {year2} (based on calendar order)")
+                logger.debug("Second leg will use next year: %s (based on calendar order)", year2)
             
             # Find the specific contract for month2 and year2
-            # First filter by month name
-            month2_contracts = self.df[self.df['month_name'] == month2_full]
-            # Then filter by year
-            contract2_candidates = month2_contracts[month2_contracts['contract_year'] == year2]
+            contract2_candidates = self._by_month_year.get((month2_idx, int(year2)), self.df.iloc[0:0])
             
             if contract2_candidates.empty:
-                print(f"Could not find second leg for spread: {month2_full} {year2}")
+                logger.debug("Could not find second leg for spread: %s %s", month2_full, year2)
                 return pd.DataFrame()
             
             # Get the specific contract for the second leg
             contract2 = contract2_candidates.iloc[0:1]
             
-            print(f"Spread legs: {contract1['TFM_Code'].iloc[0]} and {contract2['TFM_Code'].iloc[0]}")
+            logger.debug("Spread legs: %s and %s", contract1['TFM_Code'].iloc[0], contract2['TFM_Code'].iloc[0])
             
             # Create a result DataFrame with both contracts
             result = pd.DataFrame({
@@ -328,9 +454,17 @@ class DataStore:
             
             return result
         
-        print("Could not determine year for first contract leg")
+        logger.debug("Could not determine year for first contract leg")
         return pd.DataFrame()
     
+    # Query handler for each security type, used by query()
+    _DISPATCH = {
+        SecurityType.SPECIFIC: _query_specific,
+        SecurityType.GENERIC: _query_generic,
+        SecurityType.MONTHLY_GENERIC: _query_monthly_generic,
+        SecurityType.SPREAD: query_spread
+    }
+    
     def get_spread_prices(self, spread_result, intraday_data):
         """
         Calculate spread prices from intraday data for the two contracts in the spread
@@ -344,25 +478,25 @@ class DataStore:
             DataFrame with intraday spread prices
         """
         if spread_result.empty or 'contract1_code' not in spread_result.columns:
-            print("Invalid spread result provided")
+            logger.debug("Invalid spread result provided")
             return pd.DataFrame()
         
         # Get the specific contract codes
         contract1_code = spread_result['contract1_code'].iloc[0]
         contract2_code = spread_result['contract2_code'].iloc[0]
         
-        print(f"Calculating spread prices for {contract1_code} - {contract2_code}")
+        logger.debug("Calculating spread prices for %s - %s", contract1_code, contract2_code)
         
         # Filter intraday data for each contract
         contract1_data = intraday_data[intraday_data['symbol'] == contract1_code].copy()
         contract2_data = intraday_data[intraday_data['symbol'] == contract2_code].copy()
         
         if contract1_data.empty:
-            print(f"No intraday data found for first leg: {contract1_code}")
+            logger.debug("No intraday data found for first leg: %s", contract1_code)
             return pd.DataFrame()
         
         if contract2_data.empty:
-            print(f"No intraday data found for second leg: {contract2_code}")
+            logger.debug("No intraday data found for second leg: %s", contract2_code)
             return pd.DataFrame()
         
         # Create Timestamp column if it doesn't exist
@@ -370,33 +504,33 @@ class DataStore:
             # Make sure Date column is datetime
             if not pd.api.types.is_datetime64_any_dtype(contract1_data['Date']):
                 contract1_data['Date'] = pd.to_datetime(contract1_data['Date'])
-            contract1_data['Timestamp'] = pd.to_datetime(contract1_data['Date'].astype(str) + ' ' + contract1_data['Time'])
+            contract1_data['Timestamp'] = _bar_timestamps(contract1_data['Date'], contract1_data['Time'])
         
         if 'Timestamp' not in contract2_data.columns:
             # Make sure Date column is datetime
             if not pd.api.types.is_datetime64_any_dtype(contract2_data['Date']):
                 contract2_data['Date'] = pd.to_datetime(contract2_data['Date'])
-            contract2_data['Timestamp'] = pd.to_datetime(contract2_data['Date'].astype(str) + ' ' + contract2_data['Time'])
-        
-        # Merge the data on Timestamp
-        # Take only the columns we need to avoid duplicate column names
-        spread_data = pd.merge(
-            contract1_data[['Timestamp', 'Date', 'Time', 'OPEN', 'HIGH', 'LOW', 'CLOSE', 'VOLUME']],
-            contract2_data[['Timestamp', 'OPEN', 'HIGH', 'LOW', 'CLOSE', 'VOLUME']],
-            on='Timestamp',
-            suffixes=('_1', '_2')
-        )
+            contract2_data['Timestamp'] = _bar_timestamps(contract2_data['Date'], contract2_data['Time'])
+        
+        # Align the two legs on Timestamp and subtract the price block in one go
+        # (avoids the hash join and the duplicated _1/_2 columns of a merge)
+        ohlcv_cols = ['OPEN', 'HIGH', 'LOW', 'CLOSE', 'VOLUME']
+        leg1 = contract1_data.set_index('Timestamp')[['Date', 'Time'] + ohlcv_cols]
+        leg2 = contract2_data.set_index('Timestamp')[ohlcv_cols]
+        leg1 = leg1[leg1.index.isin(leg2.index)]
         
-        if spread_data.empty:
-            print("No matching timestamps between the two contracts")
+        if leg1.empty:
+            logger.debug("No matching timestamps between the two contracts")
             return pd.DataFrame()
         
-        # Calculate spread prices (leg1 - leg2)
-        spread_data['OPEN'] = spread_data['OPEN_1'] - spread_data['OPEN_2']
-        spread_data['HIGH'] = spread_data['HIGH_1'] - spread_data['HIGH_2']
-        spread_data['LOW'] = spread_data['LOW_1'] - spread_data['LOW_2']
-        spread_data['CLOSE'] = spread_data['CLOSE_1'] - spread_data['CLOSE_2']
-        spread_data['VOLUME'] = (spread_data['VOLUME_1'] + spread_data['VOLUME_2']) / 2  # Average volume
+        leg2 = leg2.loc[leg1.index]
+        
+        # Calculate spread prices (leg1 - leg2) and average volume
+        spread_data = leg1[['Date', 'Time']].reset_index()
+        spread_data[ohlcv_cols] = _spread_ohlcv(
+            leg1[ohlcv_cols].to_numpy(dtype='float64'),
+            leg2[ohlcv_cols].to_numpy(dtype='float64')
+        )
         
         # Add spread metadata
         spread_data['spread_code'] = spread_result['spread_code'].iloc[0]
@@ -431,23 +565,24 @@ class DataStore:
          TFMAPR1 refers to the first active April contract.
         """
         # Convert full month name to abbreviation
-        month_abbr_map = {
-            'January': 'JAN', 'February': 'FEB', 'March': 'MAR', 'April': 'APR',
-            'May': 'MAY', 'June': 'JUN', 'July': 'JUL', 'August': 'AUG',
-            'September': 'SEP', 'October': 'OCT', 'November': 'NOV', 'December': 'DEC'
-        }
-        
-        month_abbr = month_abbr_map.get(month_name, month_name[:3].upper())
+        month_abbr = _MONTH_NAME_TO_ABBR.get(month_name, month_name[:3].upper())
         return self.query(f"TFM{month_abbr}{sequence_number}", SecurityType.MONTHLY_GENERIC)
     
     def save_to_pickle(self, file_path):
         """
-        Serialize the DataStore to disk using pickle.
+        Serialize the DataStore (data and query lookups) to disk using pickle.
         Params:
         file_path (str): Path where the pickle file will be saved
         """
+        state = {
+            'df': self.df,
+            'tfm_code_positions': self._tfm_code_positions,
+            'by_month': self._by_month,
+            'by_month_np': self._by_month_np,
+            'by_month_year': self._by_month_year
+        }
         with open(file_path, 'wb') as f:
-            pickle.dump(self.df, f)
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
         print(f"DataStore successfully serialized to {file_path}")
         
     def load_from_pickle(self, file_path):
@@ -457,10 +592,32 @@ class DataStore:
         file_path (str): Path to the pickle file
         """
         with open(file_path, 'rb') as f:
-            self.df = pickle.load(f)
+            state = pickle.load(f)
+        
+        if isinstance(state, dict):
+            self.df = state['df']
+            self._tfm_code_positions = state['tfm_code_positions']
+            self._by_month = state['by_month']
+            self._by_month_np = state['by_month_np']
+            self._by_month_year = state['by_month_year']
+            return
+        
+        # Pickles written by older versions hold only the DataFrame, with the dates as strings
+        self.df = state.drop(columns=['TFM_Code_original'], errors='ignore')
+        for column in ['contract_month', 'expiry_date']:
+            if not pd.api.types.is_datetime64_any_dtype(self.df[column]):
+                self.df[column] = pd.to_datetime(self.df[column])
+        if 'month_idx' not in self.df.columns:
+            month_codes = self.df['TFM_Code'].str.extract(_TFM_CONTRACT_RE)[0]
+            self.df['month_idx'] = month_codes.map(_MONTH_CODE_TO_IDX).fillna(-1).astype('int8')
+        
+        self.build_lookups()
 
 # testing
 if __name__ == "__main__":
+    # Show the query trace alongside the printed results
+    logging.basicConfig(level=logging.DEBUG, format='%(message)s', stream=sys.stdout)
+    
     # Check if serialized data exists
     pickle_file = "ttf_futures_data.pkl"
     